@@ -51,7 +51,8 @@ class Fields(object) :
                   n_order=-1, v_comoving=None, use_pml=False, use_galilean=True,
                   current_correction='cross-deposition', use_cuda=False,
                   smoother=None, create_threading_buffers=False,
-                  use_ruyten_shapes=True, use_modified_volume=True ):
+                  use_ruyten_shapes=True, use_modified_volume=True,
+                  hankel_precision='double' ):
         """
         Initialize the components of the Fields object
 
@@ -120,6 +121,10 @@ class Fields(object) :
 
         use_modified_volume: bool, optional
             Whether to use the modified cell volume (only used for m=0)
+
+        hankel_precision: string, optional
+            The floating-point precision of the matrix product in the
+            Hankel transforms (either 'double' or 'single')
         """
         # Register the arguments inside the object
         self.Nz = Nz
@@ -157,7 +162,8 @@ class Fields(object) :
         self.trans = []
         for m in range(Nm) :
             self.trans.append( SpectralTransformer(
-                Nz, Nr, m, rmax, use_cuda=self.use_cuda ) )
+                Nz, Nr, m, rmax, use_cuda=self.use_cuda,
+                hankel_precision=hankel_precision ) )
 
         # Create the interpolation grid for each modes
         # (one grid per azimuthal mode)
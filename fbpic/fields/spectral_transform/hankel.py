@@ -9,8 +9,11 @@ Definition of the Hankel forward and backward transform of order p:
 g(\nu) = 2 \pi \int_0^\infty f(r) J_p( 2 \pi \nu r) r dr
 f( r ) = 2 \pi \int_0^\infty g(\nu) J_p( 2 \pi \nu r) \nu d\nu d
 """
+import weakref
+from collections import OrderedDict
 import numpy as np
 from scipy.special import jn, jn_zeros
+from scipy.linalg import lu_factor, lu_solve
 
 # Check if CUDA is available, then import CUDA functions
 from fbpic.utils.cuda import cuda_installed
@@ -22,12 +25,180 @@ if cuda_installed:
     from cupy.cuda import device, cublas
 
 
+# Cache of the Bessel zeros and of the DHT matrices, shared by all DHT
+# objects (e.g. the 3 transforms of a given azimuthal mode use the same
+# Bessel zeros, and the global fields created when initializing a beam
+# use the same matrices as the local fields of the simulation)
+# The matrix cache only holds weak references: the matrices are freed
+# as soon as no DHT object uses them any more. It is also bounded:
+# beyond `dht_matrices_cache_size` entries, the oldest entries are
+# discarded (and setting it to 0 disables the cache).
+_bessel_zeros_cache = {}
+_dht_matrices_cache = OrderedDict()
+dht_matrices_cache_size = 64
+
+def get_bessel_zeros( m, N ):
+    """
+    Return the N first positive zeros of the Bessel function of order m
+
+    The result is cached and returned as a read-only array, since
+    the same zeros are requested by several DHT objects.
+    """
+    key = (m, N)
+    if key not in _bessel_zeros_cache:
+        zeros = jn_zeros(m, N)
+        zeros.setflags(write=False)
+        _bessel_zeros_cache[key] = zeros
+    return( _bessel_zeros_cache[key] )
+
+class DHTMatrices(object):
+    """
+    Container for the (read-only) spatial grid r, spectral grid nu,
+    and matrices invM and M of a DHT.
+
+    DHT objects keep a reference to this container, so that the
+    matrices stay in the cache as long as they are in use.
+    """
+
+    def __init__( self, r, nu, invM, M ):
+        """
+        Register the arrays, and mark them as read-only
+
+        Parameters:
+        ------------
+        r, nu: 1darrays of reals
+        The spatial and spectral grid
+
+        invM, M: 2darrays of reals
+        The matrices of the inverse and forward transform
+        """
+        for array in [r, nu, invM, M]:
+            array.setflags(write=False)
+        self.r = r
+        self.nu = nu
+        self.invM = invM
+        self.M = M
+
+def get_dht_matrices( p, m, Nr, rmax, dtype=np.float64 ):
+    """
+    Return a `DHTMatrices` object with the spatial grid r, the spectral
+    grid nu, and the matrices invM and M (with data type `dtype`) for
+    the DHT of order p, for the azimuthal mode m.
+
+    The result is cached, so that DHT objects with the same parameters
+    share the same (read-only) arrays, for as long as one of them
+    exists. Only the matrices in the requested precision are computed
+    and kept.
+
+    See the docstring of `DHT.__init__` for the meaning of the arguments.
+    """
+    key = (p, m, Nr, rmax, np.dtype(dtype).str)
+
+    # Return the cached matrices, if they are still in use
+    if key in _dht_matrices_cache:
+        matrices = _dht_matrices_cache[key]()
+        if matrices is not None:
+            return( matrices )
+
+    # Otherwise, calculate the matrices in the requested precision
+    r, nu, invM, M = calculate_dht_matrices( p, m, Nr, rmax )
+    matrices = DHTMatrices( r, nu, invM.astype( dtype, copy=False ),
+                            M.astype( dtype, copy=False ) )
+
+    # Register them in the cache (if it is enabled), discarding the
+    # oldest entries if the cache is full
+    if dht_matrices_cache_size > 0:
+        _dht_matrices_cache.pop( key, None )
+        while len(_dht_matrices_cache) >= dht_matrices_cache_size \
+                and _dht_matrices_cache:
+            _dht_matrices_cache.popitem( last=False )
+        _dht_matrices_cache[key] = weakref.ref( matrices,
+            lambda ref, key=key: _remove_dht_matrices( key, ref ) )
+
+    return( matrices )
+
+def _remove_dht_matrices( key, ref ):
+    """
+    Remove the entry `key` from the cache, once the corresponding
+    matrices have been freed (unless the entry was since replaced)
+    """
+    if _dht_matrices_cache.get( key ) is ref:
+        del _dht_matrices_cache[key]
+
+def calculate_dht_matrices( p, m, Nr, rmax ):
+    """
+    Calculate the spatial grid r, the spectral grid nu, and the
+    double-precision matrices invM and M for the DHT of order p,
+    for the azimuthal mode m.
+
+    See the docstring of `DHT.__init__` for the meaning of the arguments.
+    """
+    # Calculate the zeros of the Bessel function
+    if m !=0:
+        # In this case, 0 is a zero of the Bessel function of order m.
+        # It turns out that it is needed to reconstruct the signal for p=0.
+        alphas = np.empty(Nr)
+        alphas[0] = 0.
+        alphas[1:] = get_bessel_zeros(m, Nr-1)
+    else:
+        alphas = get_bessel_zeros(m, Nr)
+
+    # Calculate the spectral grid
+    nu = 1./(2*np.pi*rmax) * alphas
+
+    # Calculate the spatial grid (Uniform grid with an half-cell offset)
+    r = (rmax*1./Nr) * ( np.arange(Nr) + 0.5 )
+
+    # Calculate the inverse matrix invM
+    # (imposed by the constraints on the DHT of Bessel modes)
+    # NB: When compared with the FBPIC article, all the matrices here
+    # are calculated in transposed form. This is done so as to use the
+    # `dot` and `gemm` functions, in the `DHT.transform` method.
+    if p == m:
+        p_denom = p+1
+    else:
+        p_denom = p
+    denom = np.pi * rmax**2 * jn( p_denom, alphas)**2
+    # Evaluate the numerator directly in invM, and then divide it
+    # by the denominator in place (avoids (Nr, Nr) temporary arrays)
+    invM = np.multiply.outer( nu, 2*np.pi*r )
+    jn( p, invM, out=invM )
+    # Get the inverse matrix
+    if m!=0:
+        invM[1:, :] /= denom[1:, np.newaxis]
+        # In this case, the functions are represented by Bessel functions
+        # *and* an additional mode (below) which satisfies the same
+        # algebric relations for curl/div/grad as the regular Bessel modes,
+        # with the value kperp=0.
+        # The normalization of this mode is arbitrary, and is chosen
+        # so that the condition number of invM is close to 1
+        if p==m-1:
+            invM[0, :] = r**(m-1) * 1./( np.pi * rmax**(m+1) )
+        else:
+            invM[0, :] = 0.
+    else :
+        invM /= denom[:, np.newaxis]
+
+    # Calculate the matrix M by inverting invM
+    if m !=0 and p != m-1:
+        M = np.empty((Nr, Nr))
+        M[:, 1:] = np.linalg.pinv( invM[1:,:] )
+        M[:, 0] = 0.
+    else:
+        # Invert invM by LU factorization and triangular solves
+        lu_piv = lu_factor( invM )
+        M = lu_solve( lu_piv, np.identity(Nr) )
+
+    return( r, nu, invM, M )
+
+
 class DHT(object):
     """
     Class that allows to perform the Discrete Hankel Transform.
     """
 
-    def __init__(self, p, m, Nr, Nz, rmax, use_cuda=False ):
+    def __init__(self, p, m, Nr, Nz, rmax, use_cuda=False,
+                 precision='double' ):
         """
         Calculate the r (position) and nu (frequency) grid
         on which the transform will operate.
@@ -51,6 +222,13 @@ class DHT(object):
 
         use_cuda: bool, optional
         Whether to use the GPU for the Hankel transform
+
+        precision: string, optional
+        The floating-point precision of the matrix product, either
+        'double' or 'single'. When using 'single', the matrices and the
+        real buffers are stored in single precision, which halves the
+        memory traffic of the matrix product. (The input and output
+        arrays remain double-precision complex arrays in both cases.)
         """
         # Register whether to use the GPU.
         # If yes, initialize the corresponding cuda object
@@ -64,6 +242,14 @@ class DHT(object):
         if (m in [p-1, p, p+1]) == False:
             raise ValueError('m must be either p-1, p or p+1')
 
+        # Register the precision of the matrix product
+        if precision == 'double':
+            dtype = np.float64
+        elif precision == 'single':
+            dtype = np.float32
+        else:
+            raise ValueError('precision must be either `double` or `single`')
+
         # Register values of the arguments
         self.p = p
         self.m = m
@@ -71,55 +257,14 @@ class DHT(object):
         self.rmax = rmax
         self.Nz = Nz
 
-        # Calculate the zeros of the Bessel function
-        if m !=0:
-            # In this case, 0 is a zero of the Bessel function of order m.
-            # It turns out that it is needed to reconstruct the signal for p=0.
-            alphas = np.hstack( (np.array([0.]), jn_zeros(m, Nr-1)) )
-        else:
-            alphas = jn_zeros(m, Nr)
-
-        # Calculate the spectral grid
-        self.nu = 1./(2*np.pi*rmax) * alphas
-
-        # Calculate the spatial grid (Uniform grid with an half-cell offset)
-        self.r = (rmax*1./Nr) * ( np.arange(Nr) + 0.5 )
-
-        # Calculate and store the inverse matrix invM
-        # (imposed by the constraints on the DHT of Bessel modes)
-        # NB: When compared with the FBPIC article, all the matrices here
-        # are calculated in transposed form. This is done so as to use the
-        # `dot` and `gemm` functions, in the `transform` method.
-        self.invM = np.empty((Nr, Nr))
-        if p == m:
-            p_denom = p+1
-        else:
-            p_denom = p
-        denom = np.pi * rmax**2 * jn( p_denom, alphas)**2
-        num = jn( p, 2*np.pi* self.r[np.newaxis,:]*self.nu[:,np.newaxis] )
-        # Get the inverse matrix
-        if m!=0:
-            self.invM[1:, :] = num[1:, :] / denom[1:, np.newaxis]
-            # In this case, the functions are represented by Bessel functions
-            # *and* an additional mode (below) which satisfies the same
-            # algebric relations for curl/div/grad as the regular Bessel modes,
-            # with the value kperp=0.
-            # The normalization of this mode is arbitrary, and is chosen
-            # so that the condition number of invM is close to 1
-            if p==m-1:
-                self.invM[0, :] = self.r**(m-1) * 1./( np.pi * rmax**(m+1) )
-            else:
-                self.invM[0, :] = 0.
-        else :
-            self.invM[:, :] = num[:, :] / denom[:, np.newaxis]
-
-        # Calculate the matrix M by inverting invM
-        self.M = np.empty((Nr, Nr))
-        if m !=0 and p != m-1:
-            self.M[:, 1:] = np.linalg.pinv( self.invM[1:,:] )
-            self.M[:, 0] = 0.
-        else:
-            self.M = np.linalg.inv( self.invM )
+        # Get the spatial and spectral grid, and the matrices of the
+        # transform in the requested precision (these read-only arrays
+        # are shared with the other DHT objects with the same parameters)
+        self.matrices = get_dht_matrices( p, m, Nr, rmax, dtype )
+        self.r = self.matrices.r
+        self.nu = self.matrices.nu
+        self.invM = self.matrices.invM
+        self.M = self.matrices.M
 
         # Copy the matrices to the GPU if needed
         if self.use_cuda:
@@ -132,16 +277,21 @@ class DHT(object):
         # product of complexs, and the real-complex conversion is negligible.)
         if not self.use_cuda:
             # Initialize real buffer arrays on the CPU
-            zero_array = np.zeros((2*Nz, Nr), dtype=np.float64)
+            zero_array = np.zeros((2*Nz, Nr), dtype=dtype)
             self.array_in = zero_array.copy()
             self.array_out = zero_array.copy()
         else:
             # Initialize real buffer arrays on the GPU
-            zero_array = np.zeros((2*Nz, Nr), dtype=np.float64)
+            zero_array = np.zeros((2*Nz, Nr), dtype=dtype)
             self.d_in = cupy.asarray( zero_array )
             self.d_out = cupy.asarray( zero_array )
-            # Initialize cuBLAS
+            # Initialize cuBLAS, and select the gemm kernel
+            # that corresponds to the requested precision
             self.blas = device.get_cublas_handle()
+            if precision == 'double':
+                self.gemm = cublas.dgemm
+            else:
+                self.gemm = cublas.sgemm
             # Set optimal number of CUDA threads per block
             # for copy 2d real/complex (determined empirically)
             copy_tpb = (8,32) if cuda_gpu_model == "V100" else (2,16)
@@ -189,10 +339,10 @@ class DHT(object):
             # Convert C-order, complex array `F` to F-order, real `d_in`
             cuda_copy_2dC_to_2dR[self.dim_grid, self.dim_block]( F, self.d_in )
             # Call cuBLAS gemm kernel
-            cublas.dgemm(self.blas, 0, 0, self.Nr, 2*self.Nz, self.Nr,
-                         1, self.d_M.data.ptr, self.Nr,
-                            self.d_in.data.ptr, self.Nr,
-                         0, self.d_out.data.ptr, self.Nr)
+            self.gemm(self.blas, 0, 0, self.Nr, 2*self.Nz, self.Nr,
+                      1, self.d_M.data.ptr, self.Nr,
+                         self.d_in.data.ptr, self.Nr,
+                      0, self.d_out.data.ptr, self.Nr)
             # Convert F-order, real `d_out` to the C-order, complex `G`
             cuda_copy_2dR_to_2dC[self.dim_grid, self.dim_block]( self.d_out, G )
         else:
@@ -220,10 +370,10 @@ class DHT(object):
             # Convert C-order, complex array `G` to F-order, real `d_in`
             cuda_copy_2dC_to_2dR[self.dim_grid, self.dim_block](G, self.d_in )
             # Call cuBLAS gemm kernel
-            cublas.dgemm(self.blas, 0, 0, self.Nr, 2*self.Nz, self.Nr,
-                         1, self.d_invM.data.ptr, self.Nr,
-                            self.d_in.data.ptr, self.Nr,
-                         0, self.d_out.data.ptr, self.Nr)
+            self.gemm(self.blas, 0, 0, self.Nr, 2*self.Nz, self.Nr,
+                      1, self.d_invM.data.ptr, self.Nr,
+                         self.d_in.data.ptr, self.Nr,
+                      0, self.d_out.data.ptr, self.Nr)
             # Convert the F-order d_out array to the C-order F array
             cuda_copy_2dR_to_2dC[self.dim_grid, self.dim_block]( self.d_out, F )
         else:
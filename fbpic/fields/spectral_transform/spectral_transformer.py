@@ -39,7 +39,8 @@ class SpectralTransformer(object) :
         converts a vector field from the interpolation to the spectral grid
     """
 
-    def __init__(self, Nz, Nr, m, rmax, use_cuda=False ) :
+    def __init__(self, Nz, Nr, m, rmax, use_cuda=False,
+                 hankel_precision='double' ) :
         """
         Initializes the dht and fft attributes, which contain auxiliary
         matrices allowing to transform the fields quickly
@@ -54,6 +55,13 @@ class SpectralTransformer(object) :
 
         rmax : float
             The size of the simulation box along r.
+
+        use_cuda : bool, optional
+            Whether to perform the transforms on the GPU
+
+        hankel_precision : string, optional
+            The floating-point precision of the matrix product in the
+            Hankel transforms (either 'double' or 'single')
         """
         # Check whether to use the GPU
         self.use_cuda = use_cuda
@@ -64,9 +72,12 @@ class SpectralTransformer(object) :
             self.dim_grid, self.dim_block = cuda_tpb_bpg_2d( Nz, Nr, 1, 32 )
 
         # Initialize the DHT (local implementation, see hankel.py)
-        self.dht0 = DHT(  m, m, Nr, Nz, rmax, use_cuda=self.use_cuda )
-        self.dhtp = DHT(m+1, m, Nr, Nz, rmax, use_cuda=self.use_cuda )
-        self.dhtm = DHT(m-1, m, Nr, Nz, rmax, use_cuda=self.use_cuda )
+        self.dht0 = DHT(  m, m, Nr, Nz, rmax, use_cuda=self.use_cuda,
+                          precision=hankel_precision )
+        self.dhtp = DHT(m+1, m, Nr, Nz, rmax, use_cuda=self.use_cuda,
+                          precision=hankel_precision )
+        self.dhtm = DHT(m-1, m, Nr, Nz, rmax, use_cuda=self.use_cuda,
+                          precision=hankel_precision )
 
         # Initialize the FFT
         self.fft = FFT( Nr, Nz, use_cuda=self.use_cuda )
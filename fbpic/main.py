@@ -60,7 +60,7 @@ class Simulation(object):
                  gamma_boost=None, use_all_mpi_ranks=True,
                  particle_shape='linear', verbose_level=1,
                  smoother=None, use_ruyten_shapes=True,
-                 use_modified_volume=True ):
+                 use_modified_volume=True, hankel_precision='double' ):
         """
         Initializes a simulation.
 
@@ -225,6 +225,15 @@ class Simulation(object):
             Whether to use a slightly-modified, effective cell volume, that
             ensures that the charge deposited near the axis is correctly
             taken into account by the spectral cylindrical Maxwell solver.
+
+        hankel_precision: string, optional
+            The floating-point precision of the matrix product in the
+            Hankel transforms, either 'double' (default) or 'single'.
+            Using 'single' halves the memory traffic of the matrix
+            products in the Hankel transforms, at the cost of a lower
+            relative accuracy of these transforms (of order 1e-7).
+            (Some initialization steps, e.g. the calculation of the
+            cell volumes, still use double-precision matrices.)
         """
         # Check whether to use CUDA
         self.use_cuda = use_cuda
@@ -303,7 +312,8 @@ class Simulation(object):
                     # Only create threading buffers when running on CPU
                     create_threading_buffers=(self.use_cuda is False),
                     use_ruyten_shapes=use_ruyten_shapes,
-                    use_modified_volume=use_modified_volume )
+                    use_modified_volume=use_modified_volume,
+                    hankel_precision=hankel_precision )
 
         # Initialize the electrons and the ions
         self.grid_shape = self.fld.interp[0].Ez.shape
@@ -56,13 +56,19 @@ def test_charge_cylinder(show=False):
     for shape in ['linear', 'cubic']:
         charge_cylinder( shape, show )
 
-def charge_cylinder(shape, show=False):
+def test_charge_cylinder_single_precision(show=False):
+    "Same test, with the Hankel transforms performed in single precision"
+    for shape in ['linear', 'cubic']:
+        charge_cylinder( shape, show, hankel_precision='single' )
+
+def charge_cylinder(shape, show=False, hankel_precision='double'):
     "On-axis cylinder of charge for different radii"
     # Initialize the simulation object
     sim = Simulation( Nz, zmax, Nr, rmax, Nm, (zmax-zmin)/Nz/c,
         p_zmin, p_zmax, p_rmin, p_rmax, p_nz, p_nr, p_nt, n_e,
         zmin=zmin, boundaries='periodic', verbose_level=0,
-        smoother=BinomialSmoother(1, False), particle_shape=shape)
+        smoother=BinomialSmoother(1, False), particle_shape=shape,
+        hankel_precision=hankel_precision)
     # store results in dict
     res = {}
     # Scale the radius of the cylinder and calculate the space charge field
@@ -0,0 +1,86 @@
+# Copyright 2016, FBPIC contributors
+# Authors: Remi Lehe, Manuel Kirchen
+# License: 3-Clause-BSD-LBNL
+"""
+This test file is part of FB-PIC (Fourier-Bessel Particle-In-Cell).
+
+It verifies the behavior of the cache of the Hankel transform matrices:
+- DHT objects with the same parameters share the same matrices
+- The matrices are freed once no DHT object uses them any more
+- The oldest entries are discarded when the cache is full
+- Setting the size of the cache to 0 disables it
+
+Usage :
+from the top-level directory of FBPIC run
+$ python tests/test_hankel_matrices_cache.py
+"""
+import gc
+import numpy as np
+from fbpic.fields.spectral_transform import hankel
+from fbpic.fields.spectral_transform.hankel import DHT
+
+# Parameters
+# ----------
+Nr = 10
+Nz = 4
+rmax = 1.
+
+# -------------
+# Test functions
+# -------------
+
+def test_shared_matrices():
+    "Check that DHT objects with the same parameters share the matrices"
+    hankel._dht_matrices_cache.clear()
+    d1 = DHT( 0, 0, Nr, Nz, rmax )
+    d2 = DHT( 0, 0, Nr, Nz, rmax )
+    assert d1.M is d2.M
+    assert d1.invM is d2.invM
+    # The shared matrices should be read-only
+    assert not d1.M.flags.writeable
+    # Matrices in a different precision should not be shared
+    d3 = DHT( 0, 0, Nr, Nz, rmax, precision='single' )
+    assert d3.M.dtype == np.float32
+    assert np.allclose( d3.M, d1.M, rtol=1.e-6 )
+    # Once no DHT uses them any more, the matrices should be freed
+    del d1, d2, d3
+    gc.collect()
+    assert len(hankel._dht_matrices_cache) == 0
+
+def test_cache_eviction():
+    "Check that the oldest entries are discarded when the cache is full"
+    hankel._dht_matrices_cache.clear()
+    size = hankel.dht_matrices_cache_size
+    try:
+        hankel.dht_matrices_cache_size = 2
+        dhts = [ DHT( 0, 0, Nr, Nz, rmax*(i+1) ) for i in range(3) ]
+        assert len(hankel._dht_matrices_cache) == 2
+        # The first DHT is not in the cache any more, so a new DHT
+        # with the same parameters recomputes the matrices ...
+        d = DHT( 0, 0, Nr, Nz, rmax )
+        assert d.M is not dhts[0].M
+        assert np.array_equal( d.M, dhts[0].M )
+        # ... while the most recent DHT is still in the cache
+        d = DHT( 0, 0, Nr, Nz, 3*rmax )
+        assert d.M is dhts[2].M
+    finally:
+        hankel.dht_matrices_cache_size = size
+
+def test_cache_disabled():
+    "Check that setting the size of the cache to 0 disables it"
+    hankel._dht_matrices_cache.clear()
+    size = hankel.dht_matrices_cache_size
+    try:
+        hankel.dht_matrices_cache_size = 0
+        d1 = DHT( 0, 0, Nr, Nz, rmax )
+        d2 = DHT( 0, 0, Nr, Nz, rmax )
+        assert len(hankel._dht_matrices_cache) == 0
+        assert d1.M is not d2.M
+        assert np.array_equal( d1.M, d2.M )
+    finally:
+        hankel.dht_matrices_cache_size = size
+
+if __name__ == '__main__' :
+    test_shared_matrices()
+    test_cache_eviction()
+    test_cache_disabled()
@@ -130,4 +130,55 @@ if __name__ == '__main__' :
       % ( abs(back_field_r - check_back_field_r).max() \
       + abs(back_field_t - check_back_field_t).max() ) )
 
-      
+    # ---------------------------------
+    # Single-precision scalar transform
+    # ---------------------------------
+    print( '\n ### Single-precision scalar transform \n' )
+
+    # Perform the double-precision transform on the CPU, for reference
+    trans_ref = SpectralTransformer( Nz, Nr, m, rmax )
+    trans_ref.interp2spect_scal( interp_field_r, spect_field_p )
+    trans_ref.spect2interp_scal( spect_field_p, back_field_r )
+    ref_spect_field_p = spect_field_p.copy()
+    ref_back_field_r = back_field_r.copy()
+
+    # Perform the transform on the CPU
+    trans_cpu = SpectralTransformer( Nz, Nr, m, rmax,
+                                     hankel_precision='single' )
+    # Do a loop so as to get the fastest time
+    # and remove compilation time
+    tmin = 1.
+    for i in range(10) :
+        s = time.time()
+        trans_cpu.interp2spect_scal( interp_field_r, spect_field_p )
+        trans_cpu.spect2interp_scal( spect_field_p, back_field_r )
+        e = time.time()
+        tmin = min(tmin, e-s )
+    print( '\n Time taken on the CPU : %.3f ms\n' %(tmin*1e3) )
+
+    # Perform the transform on the GPU
+    trans_gpu = SpectralTransformer( Nz, Nr, m, rmax, use_cuda=True,
+                                     hankel_precision='single' )
+    # Do a loop so as to get the fastest time
+    # and remove compilation time
+    tmin = 1.
+    for i in range(10) :
+        s = time.time()
+        trans_gpu.interp2spect_scal( d_interp_field_r, d_spect_field_p )
+        trans_gpu.spect2interp_scal( d_spect_field_p, d_back_field_r )
+        cuda.synchronize()
+        e = time.time()
+        tmin = min(tmin, e-s )
+    print( '\n Time taken on the GPU : %.3f ms\n' %(tmin*1e3) )
+
+    # Check accuracy (GPU vs CPU in single precision,
+    # and single precision vs double precision)
+    check_spect_field_p = d_spect_field_p.get()
+    check_back_field_r = d_back_field_r.get()
+    print( 'Max error on forward transform : %e' \
+      % abs(spect_field_p - check_spect_field_p).max() )
+    print( 'Max error on backward transform : %e' \
+      % abs(back_field_r - check_back_field_r).max() )
+    print( 'Max relative error with respect to double precision : %e\n' \
+      % ( abs(check_spect_field_p - ref_spect_field_p).max() \
+          / abs(ref_spect_field_p).max() ) )